@@ -1,11 +1,25 @@
 from django.contrib import admin
 from .models import *
-from django.forms import ModelChoiceField, ModelForm
-from PIL import Image
+from django.core.exceptions import ValidationError
+from django.forms import ModelForm
 from django.utils.safestring import mark_safe
 
-class NoteBookAdminForm(ModelForm):
+class ProductAdminForm(ModelForm):
 
+    category_slug = None
+
+    def clean(self):
+        cleaned_data = super().clean()
+        category_id = Category.objects.filter(slug=self.category_slug).values_list('id', flat=True).first()
+        if category_id is None:
+            raise ValidationError('Категория "{}" не найдена'.format(self.category_slug))
+        self.instance.category_id = category_id
+        return cleaned_data
+
+
+class NoteBookAdminForm(ProductAdminForm):
+
+    category_slug = 'notebooks'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -17,37 +31,45 @@ class NoteBookAdminForm(ModelForm):
 
     def clean_image(self):
         image = self.cleaned_data['image']
-        img = Image.open(image)
-        min_height, min_width = Product.MIN_RESOLUTION
-        max_height, max_width = Product.MAX_RESOLUTION
         if image.size > Product.MAX_IMAGE_SIZE:
             raise ValidationError('Размер картинки не должен превышать 3 мб')
-        if img.height < min_height or img.width < min_height:
-            raise ValidationError('Разрешение изображение меньше минимального')
-        if img.height > max_height or img.width > max_height:
-            raise ValidationError('Разрешение изображение больше максимального')
         return image
 
-class NoteBookAdmin(admin.ModelAdmin):
+
+class SmartphoneAdminForm(ProductAdminForm):
+
+    category_slug = 'smartphones'
+
+
+class CategoryAdmin(admin.ModelAdmin):
+
+    search_fields = ['name', 'slug']
+
+
+class ProductAdmin(admin.ModelAdmin):
+
+    exclude = ('category',)
+
+
+class NoteBookAdmin(ProductAdmin):
 
     form = NoteBookAdminForm
 
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == 'category':
-            return ModelChoiceField(Category.objects.filter(slug='notebooks'))
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+class SmartphoneAdmin(ProductAdmin):
+
+    form = SmartphoneAdminForm
 
 
-class SmartphoneAdmin(admin.ModelAdmin):
+class CartProductAdmin(admin.ModelAdmin):
 
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == 'category':
-            return ModelChoiceField(Category.objects.filter(slug='smartphones'))
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    list_display = ('id', 'cart', 'quantity', 'total_price')
+    list_select_related = ('cart', 'user', 'content_type')
+    raw_id_fields = ('cart', 'user', 'content_type')
 
-admin.site.register(Category)
+admin.site.register(Category, CategoryAdmin)
 admin.site.register(NoteBook, NoteBookAdmin)
 admin.site.register(Smartphone, SmartphoneAdmin)
-admin.site.register(CartProduct)
+admin.site.register(CartProduct, CartProductAdmin)
 admin.site.register(Cart)
 admin.site.register(Customer)
\ No newline at end of file
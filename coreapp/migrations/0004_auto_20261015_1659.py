@@ -0,0 +1,21 @@
+# Generated by Django 3.1.7 on 2026-10-15 16:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coreapp', '0003_auto_20210323_0222'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['owner', 'in_order'], name='cart_owner_inorder_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartproduct',
+            index=models.Index(fields=['content_type', 'object_id'], name='coreapp_car_content_89d7b1_idx'),
+        ),
+    ]
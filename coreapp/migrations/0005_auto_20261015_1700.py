@@ -0,0 +1,21 @@
+# Generated by Django 3.1.7 on 2026-10-15 17:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('coreapp', '0004_auto_20261015_1659'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='customer', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+    ]
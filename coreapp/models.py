@@ -1,4 +1,7 @@
+from django.apps import apps
 from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -8,18 +11,20 @@ from django.urls import reverse
 User = get_user_model()
 
 def get_models_for_count(*model_names):
-    return [models.Count(model_name) for model_name in model_names]
+    return [models.Count(model_name, distinct=True) for model_name in model_names]
 
 
 def get_product_url(obj, viewname):
     ct_model = obj.__class__._meta.model_name
     return reverse(viewname, kwargs={'ct_model' : ct_model,'slug' : obj.slug})
 
-class MinResolutionErrorException(Exception):
-    pass
 
-class MaxResolutionErrorException(Exception):
-    pass
+def update_cart_totals(cart_id, quantity_delta, price_delta):
+    if quantity_delta or price_delta:
+        Cart.objects.filter(pk=cart_id).update(
+            total_products=models.F('total_products') + quantity_delta,
+            total_price=models.F('total_price') + price_delta
+        )
 
 class LatestProductManager:
 
@@ -27,36 +32,51 @@ class LatestProductManager:
     def get_products_for_main_page(*args, **kwargs):
         with_respect_to = kwargs.get('with_respect_to')
         products = []
-        ct_models = ContentType.objects.filter(model__in=args)
-        for ct_model in ct_models:
-            model_products = ct_model.model_class()._base_manager.all().order_by('-id')[:5]
-            products.extend(model_products)
-        if with_respect_to:
-            ct_model = ContentType.objects.filter(model=with_respect_to)
-            if ct_model.exists():
-                if with_respect_to in args:
-                    return sorted(
-                        products, key=lambda x: x.__class__._meta.model_name.startswith(with_respect_to), reverse=True
-                    )
+        for model in (apps.get_model('coreapp', model_name) for model_name in args):
+            latest_ids = list(model._base_manager.order_by('-id').values_list('id', flat=True)[:5])
+            products_by_id = model._base_manager.select_related('category').only(
+                'id', 'title', 'slug', 'image', 'price', 'category__name', 'category__slug'
+            ).in_bulk(latest_ids)
+            products.extend(products_by_id[product_id] for product_id in latest_ids if product_id in products_by_id)
+        if with_respect_to and with_respect_to in args:
+            products.sort(key=lambda x: x.__class__._meta.model_name == with_respect_to, reverse=True)
         return products
 
 class LatestProducts:
     objects = LatestProductManager()
 
-class CategoryManager(models.Manager):
-    
-    CATEGORY_NAME_COUNT_NAME = {
-        'Ноутбуки' : 'notebook__count',
-        'Смартфоны' : 'smartphone__count'
+class CategoryQuerySet(models.QuerySet):
+
+    CATEGORY_SLUG_COUNT_FIELD = {
+        'notebooks' : 'notebook__count',
+        'smartphones' : 'smartphone__count'
     }
 
-    def get_queryset(self):
-        return super().get_queryset()
+    def for_left_sidebar(self):
+        models = get_models_for_count('notebook', 'smartphone')
+        return self.values('name', 'slug').annotate(*models).values(
+            'name', 'slug', *self.CATEGORY_SLUG_COUNT_FIELD.values()
+        )
+
+
+class CategoryManager(models.Manager.from_queryset(CategoryQuerySet)):
+
+    SIDEBAR_CACHE_KEY = 'sidebar_categories_v1'
+    SIDEBAR_CACHE_TIMEOUT = 300
 
     def get_categories_for_left_sidebar(self):
-        models = get_models_for_count('notebook', 'smartphone')
-        qs = list(self.get_queryset().annotate(*models).values())
-        return [dict(name=c['name'], slug=c['slug'], count=c[self.CATEGORY_NAME_COUNT_NAME[c['name']]]) for c in qs]
+        data = cache.get(self.SIDEBAR_CACHE_KEY)
+        if data is None:
+            count_fields = CategoryQuerySet.CATEGORY_SLUG_COUNT_FIELD
+            data = [
+                dict(name=r['name'], slug=r['slug'], count=r.get(count_fields.get(r['slug']), 0))
+                for r in self.for_left_sidebar()
+            ]
+            cache.set(self.SIDEBAR_CACHE_KEY, data, self.SIDEBAR_CACHE_TIMEOUT)
+        return data
+
+    def invalidate_left_sidebar_cache(self):
+        cache.delete(self.SIDEBAR_CACHE_KEY)
 
 
 
@@ -88,16 +108,17 @@ class Product(models.Model):
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        image = self.image
-        img = Image.open(image)
-        min_height, min_width = self.MIN_RESOLUTION
-        max_height, max_width = self.MAX_RESOLUTION
-        if img.height < min_height or img.width < min_height:
-            raise MinResolutionErrorException('Разрешение изображение меньше минимального')
-        if img.height > max_height or img.width > max_height:
-            raise MaxResolutionErrorException('Разрешение изображение больше максимального')
-        super().save(*args, **kwargs)
+    def clean(self):
+        if not self.image:
+            return
+        with Image.open(self.image) as img:
+            width, height = img.size
+        min_width, min_height = self.MIN_RESOLUTION
+        max_width, max_height = self.MAX_RESOLUTION
+        if width < min_width or height < min_height:
+            raise ValidationError({'image': 'Разрешение изображение меньше минимального'})
+        if width > max_width or height > max_height:
+            raise ValidationError({'image': 'Разрешение изображение больше максимального'})
 
 
 class NoteBook(Product):
@@ -130,6 +151,10 @@ class Smartphone(Product):
         return get_product_url(self, 'product_detail')
 
 class CartProduct(models.Model):
+
+    class Meta:
+        indexes = [models.Index(fields=['content_type', 'object_id'])]
+
     user = models.ForeignKey('Customer', verbose_name='Покупатель', on_delete=models.CASCADE)
     cart = models.ForeignKey('Cart', verbose_name='Корзина', on_delete=models.CASCADE, related_name='related_products')
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
@@ -141,12 +166,21 @@ class CartProduct(models.Model):
     def __str__(self):
         return "Продукт: {} (для корзины)".format(self.content_object.title)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_totals = (instance.cart_id, instance.quantity, instance.total_price)
+        return instance
+
     def save(self, *args, **kwargs):
-        self.total_price = self.qty * self.content_object.price
+        self.total_price = self.quantity * self.content_object.price
         super().save(*args, **kwargs)
 
 class Cart(models.Model):
-    
+
+    class Meta:
+        indexes = [models.Index(fields=['owner', 'in_order'], name='cart_owner_inorder_idx')]
+
     owner = models.ForeignKey('Customer', verbose_name="Владелец", on_delete=models.CASCADE)
     products = models.ManyToManyField(CartProduct, blank=True, related_name='related_cart')
     total_products = models.PositiveIntegerField(default=0)
@@ -159,7 +193,7 @@ class Cart(models.Model):
         return str(self.id)
 
 class Customer(models.Model):
-    user = models.ForeignKey(User, verbose_name='Пользователь', on_delete=models.CASCADE)
+    user = models.OneToOneField(User, verbose_name='Пользователь', on_delete=models.CASCADE, related_name='customer')
     phone = models.CharField(max_length=20, verbose_name='Номер телефона')
 
     def __str__(self):
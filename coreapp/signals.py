@@ -0,0 +1,47 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Category, NoteBook, Smartphone, CartProduct, update_cart_totals
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=NoteBook)
+@receiver(post_delete, sender=NoteBook)
+@receiver(post_save, sender=Smartphone)
+@receiver(post_delete, sender=Smartphone)
+def invalidate_left_sidebar_cache(sender, **kwargs):
+    Category.objects.invalidate_left_sidebar_cache()
+
+
+@receiver(pre_save, sender=CartProduct)
+def load_cart_product_saved_totals(sender, instance, **kwargs):
+    if kwargs.get('raw') or instance.pk is None or hasattr(instance, '_saved_totals'):
+        return
+    instance._saved_totals = CartProduct.objects.filter(pk=instance.pk).values_list(
+        'cart_id', 'quantity', 'total_price'
+    ).first()
+
+
+@receiver(post_save, sender=CartProduct)
+def add_cart_product_to_cart_totals(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        instance._saved_totals = None
+        return
+    saved_totals = None if created else getattr(instance, '_saved_totals', None)
+    saved_cart_id, saved_quantity, saved_total_price = saved_totals or (instance.cart_id, 0, 0)
+    if saved_cart_id != instance.cart_id:
+        update_cart_totals(saved_cart_id, -saved_quantity, -saved_total_price)
+        saved_quantity, saved_total_price = 0, 0
+    update_cart_totals(
+        instance.cart_id, instance.quantity - saved_quantity, instance.total_price - saved_total_price
+    )
+    instance._saved_totals = (instance.cart_id, instance.quantity, instance.total_price)
+
+
+@receiver(post_delete, sender=CartProduct)
+def remove_cart_product_from_cart_totals(sender, instance, **kwargs):
+    saved_totals = getattr(instance, '_saved_totals', (instance.cart_id, instance.quantity, instance.total_price))
+    if saved_totals is None:
+        return
+    saved_cart_id, saved_quantity, saved_total_price = saved_totals
+    update_cart_totals(saved_cart_id, -saved_quantity, -saved_total_price)
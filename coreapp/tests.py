@@ -1,3 +1,151 @@
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404
 from django.test import TestCase
 
-# Create your tests here.
+from .models import User, Category, NoteBook, Smartphone, Customer, Cart, CartProduct
+from .views import AddToCartView
+
+
+class CartTotalsTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='Ноутбуки', slug='notebooks')
+        self.notebook = NoteBook.objects.create(
+            category=category, title='Notebook', slug='notebook', image='notebook.png', price=Decimal('10.00'),
+            diagonal='15', display_type='IPS', processor_freq='3', ram='16', video='RTX'
+        )
+        self.customer = Customer.objects.create(user=User.objects.create_user('customer'), phone='1')
+        self.cart = Cart.objects.create(owner=self.customer, total_price=0)
+        self.other_cart = Cart.objects.create(owner=self.customer, total_price=0)
+
+    def assertCartTotals(self, cart, total_products, total_price):
+        cart.refresh_from_db()
+        self.assertEqual((cart.total_products, cart.total_price), (total_products, Decimal(total_price)))
+
+    def create_cart_product(self, quantity=1):
+        return CartProduct.objects.create(
+            user=self.customer, cart=self.cart, content_type=ContentType.objects.get_for_model(NoteBook),
+            object_id=self.notebook.id, quantity=quantity, total_price=0
+        )
+
+    def test_create_adds_to_cart_totals(self):
+        self.create_cart_product(quantity=2)
+        self.assertCartTotals(self.cart, 2, '20.00')
+
+    def test_edit_applies_only_the_difference(self):
+        cart_product = self.create_cart_product()
+        cart_product = CartProduct.objects.get(pk=cart_product.pk)
+        cart_product.quantity = 3
+        cart_product.save()
+        cart_product.save()
+        self.assertCartTotals(self.cart, 3, '30.00')
+
+    def test_moving_to_another_cart_moves_totals(self):
+        cart_product = CartProduct.objects.get(pk=self.create_cart_product(quantity=2).pk)
+        cart_product.cart = self.other_cart
+        cart_product.quantity = 3
+        cart_product.save()
+        self.assertCartTotals(self.cart, 0, '0.00')
+        self.assertCartTotals(self.other_cart, 3, '30.00')
+
+    def test_delete_removes_saved_totals(self):
+        cart_product = CartProduct.objects.get(pk=self.create_cart_product(quantity=2).pk)
+        cart_product.cart = self.other_cart
+        cart_product.save()
+        CartProduct.objects.get(pk=cart_product.pk).delete()
+        self.assertCartTotals(self.cart, 0, '0.00')
+        self.assertCartTotals(self.other_cart, 0, '0.00')
+
+    def test_raw_save_leaves_totals_alone(self):
+        cart_product = CartProduct(
+            user=self.customer, cart=self.cart, content_type=ContentType.objects.get_for_model(NoteBook),
+            object_id=self.notebook.id, quantity=2, total_price=Decimal('20.00')
+        )
+        cart_product.save_base(raw=True)
+        self.assertCartTotals(self.cart, 0, '0.00')
+
+    def test_raw_save_then_delete_leaves_totals_alone(self):
+        cart_product = CartProduct(
+            user=self.customer, cart=self.cart, content_type=ContentType.objects.get_for_model(NoteBook),
+            object_id=self.notebook.id, quantity=2, total_price=Decimal('20.00')
+        )
+        cart_product.save_base(raw=True)
+        cart_product.delete()
+        self.assertCartTotals(self.cart, 0, '0.00')
+
+    def test_edit_without_loaded_baseline_reads_saved_row(self):
+        cart_product = self.create_cart_product(quantity=2)
+        detached = CartProduct.objects.filter(pk=cart_product.pk).values()[0]
+        detached = CartProduct(**detached)
+        detached.quantity = 3
+        detached.save()
+        self.assertCartTotals(self.cart, 3, '30.00')
+
+
+class CategorySidebarTests(TestCase):
+
+    def test_counts_products_and_defaults_unknown_categories_to_zero(self):
+        category = Category.objects.create(name='Ноутбуки', slug='notebooks')
+        Category.objects.create(name='Планшеты', slug='tablets')
+        NoteBook.objects.create(
+            category=category, title='Notebook', slug='notebook', image='notebook.png', price=Decimal('10.00'),
+            diagonal='15', display_type='IPS', processor_freq='3', ram='16', video='RTX'
+        )
+        self.assertEqual(
+            sorted(Category.objects.get_categories_for_left_sidebar(), key=lambda c: c['slug']),
+            [
+                {'name': 'Ноутбуки', 'slug': 'notebooks', 'count': 1},
+                {'name': 'Планшеты', 'slug': 'tablets', 'count': 0},
+            ]
+        )
+
+
+class AddToCartViewTests(TestCase):
+
+    def setUp(self):
+        notebooks = Category.objects.create(name='Ноутбуки', slug='notebooks')
+        smartphones = Category.objects.create(name='Смартфоны', slug='smartphones')
+        self.notebook = NoteBook.objects.create(
+            category=notebooks, title='Notebook', slug='notebook', image='notebook.png', price=Decimal('10.00'),
+            diagonal='15', display_type='IPS', processor_freq='3', ram='16', video='RTX'
+        )
+        self.smartphone = Smartphone.objects.create(
+            category=smartphones, title='Smartphone', slug='smartphone', image='smartphone.png',
+            price=Decimal('5.00'), diagonal='6', display_type='OLED', bat_volume='4000', ram='8',
+            main_camera='48', front_camera='12'
+        )
+        self.customer = Customer.objects.create(user=User.objects.create_user('customer'), phone='1')
+        self.cart = Cart.objects.create(owner=self.customer, total_price=0)
+
+    def add_products_to_cart(self, items):
+        AddToCartView().add_products_to_cart(Cart.objects.select_related('owner').get(pk=self.cart.pk), items)
+
+    def assertCartContents(self, expected_items, total_products, total_price):
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.total_products, self.cart.total_price), (total_products, Decimal(total_price)))
+        for cart_products in (self.cart.related_products.all(), self.cart.products.all()):
+            self.assertEqual(
+                sorted((cp.content_object.slug, cp.quantity, cp.total_price) for cp in cart_products),
+                sorted((slug, quantity, Decimal(price)) for slug, quantity, price in expected_items)
+            )
+
+    def test_adds_new_items(self):
+        self.add_products_to_cart([('notebook', 'notebook', 2), ('smartphone', 'smartphone', 1)])
+        self.assertCartContents([('notebook', 2, '20.00'), ('smartphone', 1, '5.00')], 3, '25.00')
+
+    def test_skips_items_already_in_cart(self):
+        self.add_products_to_cart([('notebook', 'notebook', 1)])
+        self.add_products_to_cart([('notebook', 'notebook', 4), ('smartphone', 'smartphone', 1)])
+        self.assertCartContents([('notebook', 1, '10.00'), ('smartphone', 1, '5.00')], 2, '15.00')
+
+    def test_merges_duplicate_items(self):
+        self.add_products_to_cart([('smartphone', 'smartphone', 1), ('smartphone', 'smartphone', 2)])
+        self.assertCartContents([('smartphone', 3, '15.00')], 3, '15.00')
+
+    def test_unknown_product_raises_404(self):
+        for items in ([('tablet', 'tablet', 1)], [('notebook', 'missing', 1)]):
+            with self.assertRaises(Http404):
+                self.add_products_to_cart(items)
+        self.assertCartContents([], 0, '0.00')
@@ -1,18 +1,21 @@
 from django.shortcuts import render
 from django.views.generic import DetailView, View
-from .models import NoteBook, Smartphone, Category, LatestProducts, Customer, Cart, CartProduct
+from .models import NoteBook, Smartphone, Category, LatestProducts, Cart, CartProduct, update_cart_totals
 from .mixins import CategoryDetailMixin
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, Http404
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Prefetch, Q
 
 
 class BaseView(View):
     def get(self, request, *args, **kwargs):
         categories = Category.objects.get_categories_for_left_sidebar()
         products = LatestProducts.objects.get_products_for_main_page('notebook', 'smartphone')
-        customer = Customer.objects.get(user=request.user)
-        cart = Cart.objects.get(owner=customer)
-        
+        cart = Cart.objects.select_related('owner__user').prefetch_related(
+            Prefetch('related_products', queryset=CartProduct.objects.select_related('content_type'))
+        ).get(owner__user=request.user, in_order=False)
+
         context = {
             'categories': categories,
             'products': products,
@@ -53,25 +56,69 @@ class CategoryDetailView(CategoryDetailMixin,DetailView):
 
 class AddToCartView(View):
 
+    CT_MODEL_MODEL_CLASS = ProductDetailView.CT_MODEL_MODEL_CLASS
+
     def get(self, request, *args, **kwargs):
-        ct_model, product_slug = kwargs.get('ct_model'), kwargs.get('slug')
-        customer = Customer.objects.get(user=request.user)
-        cart = Cart.objects.get(owner=customer, in_order=False)
-        content_type = ContentType.objects.get(model=ct_model)
-        product = content_type.model_class().objects.get_or_create(slug=product_slug)
-        cart_product = CartProduct.objects.create(
-            user=cart.owner, cart=cart, content_type=content_type, object_id=product_id
-        )
-        if created:
-            cart.products.add(cart_product)
+        cart = Cart.objects.select_related('owner').get(owner__user=request.user, in_order=False)
+        self.add_products_to_cart(cart, [(kwargs.get('ct_model'), kwargs.get('slug'), 1)])
         return HttpResponseRedirect('/cart/')
 
+    @transaction.atomic
+    def add_products_to_cart(self, cart, items):
+        try:
+            model_classes = {ct_model: self.CT_MODEL_MODEL_CLASS[ct_model] for ct_model, slug, quantity in items}
+        except KeyError:
+            raise Http404
+        Cart.objects.select_for_update().only('id').get(pk=cart.pk)
+        content_types = ContentType.objects.get_for_models(*model_classes.values())
+        products = {
+            ct_model: model_cls._base_manager.filter(
+                slug__in=[slug for item_ct_model, slug, quantity in items if item_ct_model == ct_model]
+            ).in_bulk(field_name='slug')
+            for ct_model, model_cls in model_classes.items()
+        }
+        in_cart = set(cart.related_products.values_list('content_type_id', 'object_id'))
+        new_cart_products = {}
+        for ct_model, slug, quantity in items:
+            product = products[ct_model].get(slug)
+            if product is None:
+                raise Http404
+            content_type = content_types[model_classes[ct_model]]
+            key = (content_type.id, product.id)
+            if key in in_cart:
+                continue
+            if key not in new_cart_products:
+                new_cart_products[key] = CartProduct(
+                    user=cart.owner, cart=cart, content_type=content_type, object_id=product.id, quantity=0
+                )
+            cart_product = new_cart_products[key]
+            cart_product.quantity += quantity
+            cart_product.total_price = cart_product.quantity * product.price
+        if not new_cart_products:
+            return
+        cart_products = CartProduct.objects.bulk_create(new_cart_products.values(), batch_size=1000)
+        update_cart_totals(
+            cart.id,
+            sum(cart_product.quantity for cart_product in cart_products),
+            sum(cart_product.total_price for cart_product in cart_products)
+        )
+        if not connection.features.can_return_rows_from_bulk_insert:
+            inserted = Q()
+            for content_type_id, object_id in new_cart_products:
+                inserted |= Q(content_type_id=content_type_id, object_id=object_id)
+            cart_products = cart.related_products.filter(inserted, related_cart=None)
+        cart.products.add(*cart_products)
+
 
 class CartView(View):
 
     def get(self, request, *args, **kwargs):
-        customer = Customer.objects.get(user=request.user)
-        cart = Cart.objects.get(owner=customer)
+        cart = Cart.objects.select_related('owner__user').prefetch_related(
+            Prefetch(
+                'related_products',
+                queryset=CartProduct.objects.select_related('content_type').prefetch_related('content_object')
+            )
+        ).get(owner__user=request.user, in_order=False)
         categories = Category.objects.get_categories_for_left_sidebar()
         context = {
             'cart': cart,